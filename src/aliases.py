@@ -0,0 +1,207 @@
+"""
+Learned alias table: normalized query string -> canonical `links.dj_name`.
+
+Aliases are checked with a primary-key equality lookup before any trigram search.
+An alias never applies when a `links` row has the same normalized name.
+They come from three sources, in increasing order of trust:
+- learned:   the same query fuzzily resolved to the same DJ with high confidence LEARN_AFTER_HITS times
+- confirmed: a user answered "Yes" to "Is this the DJ you're referring to?" in /add_link
+- moderator: accepted in the Link Moderator tool, or bulk-imported from CSV
+
+A lower-trust source never overwrites a higher-trust one.
+
+Bulk import/export (CSV with header `alias,dj_name`; export adds a `source` column):
+    python src/aliases.py import aliases.csv
+    python src/aliases.py export aliases.csv
+"""
+
+from __future__ import annotations
+
+import csv
+import re
+import string
+import sys
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Iterable, List, Optional, Tuple
+
+SOURCE_LEARNED = "learned"
+SOURCE_CONFIRMED = "confirmed"
+SOURCE_MODERATOR = "moderator"
+
+LEARN_MIN_SIMILARITY = 0.7
+LEARN_AFTER_HITS = 3
+
+_SOURCE_RANK_SQL = "CASE {col} WHEN 'moderator' THEN 3 WHEN 'confirmed' THEN 2 ELSE 1 END"
+
+# Normalization is deliberately ASCII-only so SQL can reproduce it exactly, independent
+# of the database locale: NORMALIZE_SQL(x) == normalize_alias(x) for every string.
+# Used on `links.dj_name` by the shadowing checks below and by its expression index.
+_ASCII_SPACE = " \t\n\r\f\v"
+_ASCII_SPACE_RUN = re.compile(f"[{_ASCII_SPACE}]+")
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+NORMALIZE_SQL = (
+    r"regexp_replace(translate(btrim({col}, E' \t\n\r\f\x0b'), "
+    "'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), "
+    r"E'[ \t\n\r\f\x0b]+', ' ', 'g')"
+)
+
+
+def normalize_alias(text: str) -> str:
+    """
+    Trims, lowercases A-Z and collapses ASCII whitespace: "  DJ   Snake " -> "dj snake".
+    """
+    return _ASCII_SPACE_RUN.sub(" ", text.strip(_ASCII_SPACE).translate(_ASCII_LOWER))
+
+
+# -----------------------------------------------------------------------------
+# Database helpers (callers own the connection and the commit)
+# -----------------------------------------------------------------------------
+
+def lookup_alias(cur, query: str, link_type: str) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Returns (dj_name, link) for an exact alias hit, else None. An alias that has since
+    become a real DJ's name is ignored, so the trigram search finds that DJ instead.
+    `link_type` must be "quest_link" or "non_quest_link".
+    """
+    cur.execute(f"""
+    SELECT l.dj_name, l.{link_type}
+    FROM dj_aliases a
+    JOIN links l ON l.dj_name = a.dj_name
+    WHERE a.alias = %s
+      AND NOT EXISTS (SELECT 1 FROM links x WHERE {NORMALIZE_SQL.format(col="x.dj_name")} = a.alias)
+    LIMIT 1;
+    """, (normalize_alias(query),))
+    return cur.fetchone()
+
+
+def record_alias(cur, alias: str, dj_name: str, source: str) -> bool:
+    """
+    Upserts an alias for an existing `links` row. Returns True if a row was written.
+    Skips aliases that normalize to the canonical name itself or to any other DJ's
+    name, unknown DJs, and attempts to overwrite an alias from a more trusted source.
+    """
+    key = normalize_alias(alias)
+    if not key or key == normalize_alias(dj_name):
+        return False
+
+    cur.execute(f"""
+    INSERT INTO dj_aliases (alias, dj_name, source)
+    SELECT %s, l.dj_name, %s FROM links l
+    WHERE l.dj_name = %s
+      AND NOT EXISTS (SELECT 1 FROM links x WHERE {NORMALIZE_SQL.format(col="x.dj_name")} = %s)
+    LIMIT 1
+    ON CONFLICT (alias) DO UPDATE
+        SET dj_name = EXCLUDED.dj_name, source = EXCLUDED.source
+        WHERE {_SOURCE_RANK_SQL.format(col="dj_aliases.source")}
+           <= {_SOURCE_RANK_SQL.format(col="EXCLUDED.source")};
+    """, (key, source, dj_name, key))
+    return cur.rowcount > 0
+
+
+def load_aliases(cur) -> List[Tuple[str, str]]:
+    cur.execute("SELECT alias, dj_name FROM dj_aliases;")
+    return cur.fetchall()
+
+
+# -----------------------------------------------------------------------------
+# Learning from repeated fuzzy hits
+# -----------------------------------------------------------------------------
+
+class AliasLearner:
+    """
+    Counts high-confidence fuzzy resolutions per (normalized query, dj_name) in a
+    bounded LRU, and says when a pair has been seen often enough to persist.
+    """
+    def __init__(self, min_similarity: float = LEARN_MIN_SIMILARITY,
+                 after_hits: int = LEARN_AFTER_HITS, max_keys: int = 10_000):
+        self.min_similarity = min_similarity
+        self.after_hits = after_hits
+        self.max_keys = max_keys
+        self._counts: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+
+    def observe(self, query: str, dj_name: str, score: float) -> bool:
+        """
+        Returns True on the hit that reaches `after_hits`; the pair's count then resets.
+        """
+        if score < self.min_similarity:
+            return False
+        key = (normalize_alias(query), dj_name)
+        if not key[0] or key[0] == normalize_alias(dj_name):
+            return False
+
+        count = self._counts.pop(key, 0) + 1
+        if count >= self.after_hits:
+            return True
+        self._counts[key] = count
+        while len(self._counts) > self.max_keys:
+            self._counts.popitem(last=False)
+        return False
+
+
+# -----------------------------------------------------------------------------
+# Bulk import / export
+# -----------------------------------------------------------------------------
+
+def import_aliases(conn, rows: Iterable[Tuple[str, str]]) -> Tuple[int, int]:
+    """
+    Imports (alias, dj_name) pairs as moderator aliases. Returns (written, skipped).
+    """
+    written = skipped = 0
+    with conn.cursor() as cur:
+        for alias, dj_name in rows:
+            if record_alias(cur, alias, dj_name.strip(), SOURCE_MODERATOR):
+                written += 1
+            else:
+                skipped += 1
+    conn.commit()
+    return written, skipped
+
+
+def export_aliases(conn) -> List[Tuple[str, str, str]]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT alias, dj_name, source FROM dj_aliases ORDER BY dj_name, alias;")
+        return cur.fetchall()
+
+
+def main(argv: List[str]) -> int:
+    import argparse
+    import os
+
+    import psycopg2
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Import or export DJ name aliases as CSV.")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("path", nargs="?", help="CSV file (default: stdin/stdout)")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    database_url = os.getenv("DATABASE_URL_DJ", "").strip()
+    if not database_url:
+        print("DATABASE_URL_DJ is not set.", file=sys.stderr)
+        return 1
+
+    conn = psycopg2.connect(database_url)
+    try:
+        if args.action == "import":
+            with (open(args.path, newline="", encoding="utf-8") if args.path else nullcontext(sys.stdin)) as f:
+                reader = csv.DictReader(f)
+                written, skipped = import_aliases(conn, ((r["alias"], r["dj_name"]) for r in reader))
+            print(f"Imported {written} aliases ({skipped} skipped: unknown DJ, redundant or outranked).")
+        else:
+            rows = export_aliases(conn)
+            with (open(args.path, "w", newline="", encoding="utf-8") if args.path else nullcontext(sys.stdout)) as f:
+                writer = csv.writer(f)
+                writer.writerow(["alias", "dj_name", "source"])
+                writer.writerows(rows)
+            if args.path:
+                print(f"Exported {len(rows)} aliases to {args.path}.")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,172 @@
+"""
+HTTP lookup API for overlays and VRChat world scripts.
+
+Runs inside the bot's event loop (see `MyBot.setup_hook`) and answers entirely
+from the shared in-memory `Catalog`, so polling clients never touch the DB.
+
+Endpoints:
+- POST /v1/lookup    {"dj_names": [...], "quest": bool} -> best match per name, with liveness
+- GET  /v1/catalog   full catalog JSON; honours If-None-Match and Accept-Encoding: gzip
+- GET  /healthz      liveness + catalog size
+
+Clients are rate limited per `X-API-Key` header if it is one of the configured keys,
+otherwise per remote address, so made-up keys cannot mint fresh buckets.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from aiohttp import web
+
+from catalog import Catalog
+from prober import LinkProber
+from ratelimit import TokenBuckets
+
+MAX_BATCH_NAMES = 50
+MAX_BODY_BYTES = 64 * 1024
+
+CATALOG_KEY = web.AppKey("catalog", Catalog)
+LIMITER_KEY = web.AppKey("limiter", TokenBuckets)
+PROBER_KEY = web.AppKey("prober", Optional[LinkProber])
+API_KEYS_KEY = web.AppKey("api_keys", FrozenSet[str])
+
+
+def _client_key(request: web.Request) -> str:
+    api_key = request.headers.get("X-API-Key", "").strip()
+    if api_key and api_key in request.app[API_KEYS_KEY]:
+        return f"key:{api_key}"
+    return f"ip:{request.remote}"
+
+
+def _throttle(request: web.Request, cost: float) -> None:
+    """
+    Raises 429 with Retry-After if the caller's bucket cannot pay `cost`.
+    """
+    wait = request.app[LIMITER_KEY].try_acquire(_client_key(request), cost)
+    if wait > 0.0:
+        raise web.HTTPTooManyRequests(
+            text='{"error": "rate limited"}',
+            content_type="application/json",
+            headers={"Retry-After": str(max(1, round(wait)))},
+        )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
+async def handle_lookup(request: web.Request) -> web.Response:
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text='{"error": "body must be JSON"}', content_type="application/json")
+
+    dj_names = payload.get("dj_names") if isinstance(payload, dict) else None
+    quest = payload.get("quest", False) if isinstance(payload, dict) else False
+    if not isinstance(dj_names, list) or not all(isinstance(n, str) for n in dj_names):
+        raise web.HTTPBadRequest(
+            text='{"error": "dj_names must be a list of strings"}', content_type="application/json"
+        )
+    if not isinstance(quest, bool):
+        raise web.HTTPBadRequest(
+            text='{"error": "quest must be true or false"}', content_type="application/json"
+        )
+
+    names = [name.strip() for name in dj_names if name.strip()]
+    if len(names) > MAX_BATCH_NAMES:
+        raise web.HTTPBadRequest(
+            text=f'{{"error": "at most {MAX_BATCH_NAMES} dj_names per request"}}',
+            content_type="application/json",
+        )
+
+    _throttle(request, cost=max(1, len(names)))
+
+    catalog = request.app[CATALOG_KEY]
+    prober = request.app[PROBER_KEY]
+    is_quest = quest
+    results: List[Dict[str, Any]] = []
+    for name in names:
+        match = catalog.lookup(name)
+        if match:
+            entry, score = match
+            link = entry.link(is_quest)
+            status = prober.status_for(link) if prober else None
+            results.append({
+                "query": name,
+                "dj_name": entry.dj_name,
+                "link": link,
+                "similarity": round(score, 3),
+                "status": status.status if status else None,
+                "last_seen_live": status.last_seen_live if status else None,
+            })
+        else:
+            results.append({
+                "query": name, "dj_name": None, "link": None, "similarity": None,
+                "status": None, "last_seen_live": None,
+            })
+
+    resp = web.json_response({"quest": is_quest, "results": results})
+    resp.enable_compression()
+    return resp
+
+
+async def handle_catalog(request: web.Request) -> web.Response:
+    _throttle(request, cost=1)
+
+    catalog = request.app[CATALOG_KEY]
+    etag = catalog.etag
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=60",
+        "Vary": "Accept-Encoding",
+    }
+
+    if _etag_matches(request.headers.get("If-None-Match", ""), etag):
+        return web.Response(status=304, headers=headers)
+
+    if "gzip" in request.headers.get("Accept-Encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return web.Response(body=catalog.body_gzip, content_type="application/json", headers=headers)
+
+    return web.Response(body=catalog.body, content_type="application/json", headers=headers)
+
+
+async def handle_health(request: web.Request) -> web.Response:
+    catalog = request.app[CATALOG_KEY]
+    return web.json_response({"ok": True, "links": len(catalog), "loaded_at": catalog.loaded_at})
+
+
+def create_app(catalog: Catalog, limiter: TokenBuckets, prober: Optional[LinkProber] = None,
+               api_keys: FrozenSet[str] = frozenset()) -> web.Application:
+    app = web.Application(client_max_size=MAX_BODY_BYTES)
+    app[CATALOG_KEY] = catalog
+    app[LIMITER_KEY] = limiter
+    app[PROBER_KEY] = prober
+    app[API_KEYS_KEY] = api_keys
+    app.router.add_post("/v1/lookup", handle_lookup)
+    app.router.add_get("/v1/catalog", handle_catalog)
+    app.router.add_get("/healthz", handle_health)
+    return app
+
+
+async def start_api(catalog: Catalog, limiter: TokenBuckets, host: str, port: int,
+                    prober: Optional[LinkProber] = None,
+                    api_keys: FrozenSet[str] = frozenset()) -> web.AppRunner:
+    """
+    Starts the API on the running event loop. Caller owns the runner and must `cleanup()` it.
+    """
+    runner = web.AppRunner(create_app(catalog, limiter, prober, api_keys), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logging.info(f"HTTP API listening on {host}:{port}")
+    return runner
@@ -14,10 +14,23 @@ Optional:
 - WHITELISTED_SERVERS      (comma-separated guild IDs that bypass premium gating)
 - LOG_LEVEL                (INFO, DEBUG, etc.)
 - PREMIUM_UPSELL_URL       (a URL you want to show for "subscribe here" - can be your app directory listing)
+- RATE_LIMIT_USER          (token bucket "burst/per_minute" per user,   default 10/20)
+- RATE_LIMIT_GUILD         (token bucket "burst/per_minute" per guild,  default 40/120)
+- RATE_LIMIT_GLOBAL        (token bucket "burst/per_minute" bot-wide,   default 200/600)
+- API_PORT                 (HTTP lookup API port, default 5001; set to 0 to disable)
+- API_HOST                 (HTTP lookup API bind address, default 0.0.0.0)
+- API_RATE_LIMIT           (token bucket "burst/per_minute" per API key or IP, default 60/120)
+- API_KEYS                 (comma-separated API keys that get their own rate-limit bucket; others are limited per IP)
+- CATALOG_REFRESH_SECONDS  (how often the in-memory catalog is reloaded from `links`, default 300)
+- PROBE_CONCURRENCY        (max concurrent stream-link probes, default 16; set to 0 to disable the prober)
+- PROBE_PER_HOST           (max concurrent probes per stream host, default 4)
+- PROBE_LIVE_INTERVAL      (seconds between re-checks of a live stream, default 120)
+- MIGRATE_ON_STARTUP       (apply schema migrations and check query plans at startup, default true)
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import time
@@ -32,6 +45,13 @@ from discord import app_commands
 from discord.ui import View, Button
 from dotenv import load_dotenv
 
+import aliases
+import migrations
+from api import start_api
+from catalog import Catalog
+from prober import LinkProber, describe
+from ratelimit import AdmissionController, BucketConfig, TokenBuckets
+
 
 # -----------------------------------------------------------------------------
 # Config / Logging
@@ -64,6 +84,55 @@ if WHITELISTED_SERVERS_RAW:
     except ValueError:
         logging.warning("WHITELISTED_SERVERS contains non-integer values; ignoring.")
 
+# Admission control. Costs are in "DJ lookups": each name in /get_dj_links costs 1.
+RATE_LIMIT_USER = BucketConfig.parse(
+    os.getenv("RATE_LIMIT_USER", "").strip(),
+    BucketConfig(capacity=10, refill_per_sec=20 / 60),
+    "RATE_LIMIT_USER",
+)
+RATE_LIMIT_GUILD = BucketConfig.parse(
+    os.getenv("RATE_LIMIT_GUILD", "").strip(),
+    BucketConfig(capacity=40, refill_per_sec=120 / 60),
+    "RATE_LIMIT_GUILD",
+)
+RATE_LIMIT_GLOBAL = BucketConfig.parse(
+    os.getenv("RATE_LIMIT_GLOBAL", "").strip(),
+    BucketConfig(capacity=200, refill_per_sec=600 / 60),
+    "RATE_LIMIT_GLOBAL",
+)
+ADD_LINK_COST = 3  # similarity search + insert + a view held open for up to 60s
+MAX_DJ_NAMES_PER_CALL = 20
+
+# HTTP lookup API (served from the in-memory catalog)
+API_HOST = os.getenv("API_HOST", "0.0.0.0").strip()
+API_RATE_LIMIT = BucketConfig.parse(
+    os.getenv("API_RATE_LIMIT", "").strip(),
+    BucketConfig(capacity=60, refill_per_sec=120 / 60),
+    "API_RATE_LIMIT",
+)
+API_KEYS = frozenset(key.strip() for key in os.getenv("API_KEYS", "").split(",") if key.strip())
+try:
+    API_PORT = int(os.getenv("API_PORT", "5001").strip() or 0)
+except ValueError:
+    logging.warning("API_PORT is not an integer; HTTP API disabled.")
+    API_PORT = 0
+try:
+    CATALOG_REFRESH_SECONDS = max(10, int(os.getenv("CATALOG_REFRESH_SECONDS", "300").strip()))
+except ValueError:
+    logging.warning("CATALOG_REFRESH_SECONDS is not an integer; using 300.")
+    CATALOG_REFRESH_SECONDS = 300
+
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "true").strip().lower() not in ("0", "false", "no")
+
+# Stream liveness prober
+try:
+    PROBE_CONCURRENCY = max(0, int(os.getenv("PROBE_CONCURRENCY", "16").strip() or 0))
+    PROBE_PER_HOST = max(1, int(os.getenv("PROBE_PER_HOST", "4").strip()))
+    PROBE_LIVE_INTERVAL = max(30, int(os.getenv("PROBE_LIVE_INTERVAL", "120").strip()))
+except ValueError:
+    logging.warning("PROBE_* settings must be integers; using defaults.")
+    PROBE_CONCURRENCY, PROBE_PER_HOST, PROBE_LIVE_INTERVAL = 16, 4, 120
+
 
 def require_env() -> None:
     missing = []
@@ -89,52 +158,89 @@ def db_connect():
     return psycopg2.connect(DATABASE_URL)
 
 
-def get_dj_links_from_db(dj_name: str, is_quest: bool) -> Optional[Tuple[str, Optional[str]]]:
+ALIAS_LEARNER = aliases.AliasLearner()
+
+
+def get_dj_links_from_db(dj_name: str, is_quest: bool) -> Optional[Tuple[str, Optional[str], float]]:
     """
-    Retrieves best match DJ link using pg_trgm similarity.
-    Expects table `links(dj_name, quest_link, non_quest_link)` and pg_trgm installed.
+    Retrieves best match DJ link as (dj_name, link, similarity): exact alias hit first
+    (similarity 1.0), then pg_trgm similarity.
+    Expects the schema from migrations.py (`links`, `dj_aliases`, pg_trgm and its trigram index).
     """
     link_type = "quest_link" if is_quest else "non_quest_link"
 
+    # `%%` (pg_trgm's `%`, default threshold 0.3) and `<->` let the trigram GiST index
+    # prefilter and order candidates; the explicit SIMILARITY check keeps the 0.4 cutoff.
     query = f"""
-    SELECT dj_name, {link_type}
+    SELECT dj_name, {link_type}, SIMILARITY(dj_name, %s)
     FROM links
-    WHERE SIMILARITY(dj_name, %s) > 0.4
-    ORDER BY SIMILARITY(dj_name, %s) DESC
+    WHERE dj_name %% %s AND SIMILARITY(dj_name, %s) > 0.4
+    ORDER BY dj_name <-> %s
     LIMIT 1;
     """
 
     conn = db_connect()
     try:
         with conn.cursor() as cur:
-            cur.execute(query, (dj_name, dj_name))
-            row = cur.fetchone()
-            return row  # (dj_name, link)
+            row = aliases.lookup_alias(cur, dj_name, link_type)
+            if row:
+                return row[0], row[1], 1.0
+
+            cur.execute(query, (dj_name, dj_name, dj_name, dj_name))
+            return cur.fetchone()
     finally:
         conn.close()
 
 
 def search_existing_dj_in_links(dj_name: str) -> Optional[Tuple[str, Optional[str]]]:
     """
-    Finds an existing DJ in `links` using similarity match (lowercased).
+    Finds an existing DJ in `links` using similarity match (pg_trgm is case-insensitive).
     Returns (existing_dj_name, existing_quest_link).
     """
     query = """
     SELECT dj_name, quest_link
     FROM links
-    WHERE SIMILARITY(LOWER(dj_name), LOWER(%s)) > 0.4
+    WHERE dj_name %% %s AND SIMILARITY(dj_name, %s) > 0.4
+    ORDER BY dj_name <-> %s
     LIMIT 1;
     """
 
     conn = db_connect()
     try:
         with conn.cursor() as cur:
-            cur.execute(query, (dj_name,))
+            cur.execute(query, (dj_name, dj_name, dj_name))
             return cur.fetchone()
     finally:
         conn.close()
 
 
+def record_learned_alias(alias: str, dj_name: str, score: float) -> None:
+    """
+    Stores an alias learned from repeated high-confidence fuzzy matches.
+    """
+    conn = db_connect()
+    try:
+        with conn.cursor() as cur:
+            if aliases.record_alias(cur, alias, dj_name, aliases.SOURCE_LEARNED):
+                conn.commit()
+                logging.info(f"Learned alias {alias!r} -> {dj_name!r} (similarity {score:.2f})")
+    finally:
+        conn.close()
+
+
+def record_confirmed_alias(alias: str, dj_name: str) -> None:
+    """
+    Stores a user-confirmed alias (from the /add_link "Is this the DJ...?" prompt).
+    """
+    conn = db_connect()
+    try:
+        with conn.cursor() as cur:
+            aliases.record_alias(cur, alias, dj_name, aliases.SOURCE_CONFIRMED)
+        conn.commit()
+    finally:
+        conn.close()
+
+
 def insert_request(dj_name: str, dj_link: str, submitter_id: int) -> None:
     """
     Inserts a row into `requests(dj_name, dj_link, submitter_id, review_status)`.
@@ -286,6 +392,31 @@ async def ensure_premium_or_upsell(interaction: discord.Interaction) -> bool:
     return False
 
 
+# -----------------------------------------------------------------------------
+# Admission control
+# -----------------------------------------------------------------------------
+
+ADMISSION = AdmissionController(RATE_LIMIT_USER, RATE_LIMIT_GUILD, RATE_LIMIT_GLOBAL)
+
+
+async def admit_or_slow_down(interaction: discord.Interaction, cost: float) -> bool:
+    """
+    Returns True if the user/guild/global buckets can pay `cost`, otherwise sends an
+    ephemeral "slow down" reply and returns False. Runs before any DB or entitlement call.
+    """
+    wait = ADMISSION.admit(interaction.user.id, interaction.guild_id, cost)
+    if wait == 0.0:
+        return True
+
+    logging.info(f"Throttled user {interaction.user.id} (guild {interaction.guild_id}, cost {cost}); retry in {wait:.1f}s")
+    msg = f"You're sending requests too quickly. Please try again in {max(1, round(wait))}s."
+    if interaction.response.is_done():
+        await interaction.followup.send(msg, ephemeral=True)
+    else:
+        await interaction.response.send_message(msg, ephemeral=True)
+    return False
+
+
 # -----------------------------------------------------------------------------
 # Discord Bot Setup
 # -----------------------------------------------------------------------------
@@ -298,10 +429,76 @@ class MyBot(discord.Client):
         super().__init__(intents=intents)
         self.tree = app_commands.CommandTree(self)
         self.last_startup_time: Optional[datetime] = None
+        self.catalog = Catalog(db_connect)
+        self.prober: Optional[LinkProber] = None
+        if PROBE_CONCURRENCY:
+            self.prober = LinkProber(
+                db_connect,
+                concurrency=PROBE_CONCURRENCY,
+                per_host=PROBE_PER_HOST,
+                live_interval=PROBE_LIVE_INTERVAL,
+            )
+        self._api_runner = None
+        self._background_tasks: List[asyncio.Task] = []
 
     async def setup_hook(self):
         await self.tree.sync()
 
+        if MIGRATE_ON_STARTUP:
+            await self.migrate_schema()
+        await self.refresh_catalog()
+        self._background_tasks.append(asyncio.create_task(self._catalog_refresh_loop()))
+
+        if self.prober:
+            self._background_tasks.append(asyncio.create_task(self.prober.run(self.catalog.links)))
+
+        if API_PORT:
+            self._api_runner = await start_api(
+                self.catalog, TokenBuckets(API_RATE_LIMIT), API_HOST, API_PORT,
+                prober=self.prober, api_keys=API_KEYS,
+            )
+
+    async def migrate_schema(self) -> None:
+        """
+        Applies pending migrations, then warns about hot queries that can't use their index.
+        A failure here is logged, not fatal: lookups still work, just without the indexes.
+        """
+        try:
+            applied = await asyncio.to_thread(migrations.migrate, db_connect)
+            if applied:
+                logging.info(f"Applied schema migrations: {', '.join(map(str, applied))}")
+        except Exception:
+            logging.exception("Schema migration failed; continuing with the existing schema.")
+
+        # Checked even if a migration failed: that is exactly when a seq scan warning matters
+        try:
+            for problem in await asyncio.to_thread(migrations.check_plans, db_connect):
+                logging.warning(f"Plan check failed - {problem}")
+        except Exception:
+            logging.exception("Query plan check failed.")
+
+    async def refresh_catalog(self) -> None:
+        try:
+            await asyncio.to_thread(self.catalog.refresh)
+        except Exception:
+            logging.exception("Failed to refresh catalog; keeping previous snapshot.")
+
+    async def _catalog_refresh_loop(self) -> None:
+        while not self.is_closed():
+            await asyncio.sleep(CATALOG_REFRESH_SECONDS)
+            await self.refresh_catalog()
+
+    async def close(self):
+        for task in self._background_tasks:
+            task.cancel()
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        self._background_tasks.clear()
+
+        if self._api_runner is not None:
+            await self._api_runner.cleanup()
+            self._api_runner = None
+        await super().close()
+
 
 bot = MyBot()
 
@@ -329,6 +526,37 @@ class ConfirmView(View):
         self.stop()
 
 
+# -----------------------------------------------------------------------------
+# Lookups
+# -----------------------------------------------------------------------------
+
+async def find_dj_link(dj_name: str, is_quest: bool) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Resolves a DJ through the same in-memory catalog the HTTP API serves (alias, then
+    trigram match). Falls back to the DB when the catalog is empty or has no match, so
+    links approved since the last refresh are still found.
+    Repeated high-confidence fuzzy hits are promoted to learned aliases; the learner is
+    only touched here, on the event loop.
+    """
+    match = bot.catalog.lookup(dj_name) if len(bot.catalog) else None
+    if match is not None:
+        entry, score = match
+        found_dj_name, link = entry.dj_name, entry.link(is_quest)
+    else:
+        row = await asyncio.to_thread(get_dj_links_from_db, dj_name, is_quest)
+        if row is None:
+            return None
+        found_dj_name, link, score = row
+
+    # Score 1.0 is an alias or exact-name hit; nothing to learn from those
+    if score < 1.0 and ALIAS_LEARNER.observe(dj_name, found_dj_name, score):
+        try:
+            await asyncio.to_thread(record_learned_alias, dj_name, found_dj_name, score)
+        except Exception:
+            logging.exception("Failed to record learned alias.")
+    return found_dj_name, link
+
+
 # -----------------------------------------------------------------------------
 # Commands
 # -----------------------------------------------------------------------------
@@ -339,12 +567,23 @@ class ConfirmView(View):
     dj_names="Enter DJ names separated by commas.",
 )
 async def get_dj_links(interaction: discord.Interaction, quest: bool, dj_names: str = ""):
+    # Split DJ names
+    dj_names_list = [name.strip() for name in dj_names.split(",") if name.strip()]
+    if len(dj_names_list) > MAX_DJ_NAMES_PER_CALL:
+        await interaction.response.send_message(
+            f"Please ask for at most {MAX_DJ_NAMES_PER_CALL} DJs at a time.",
+            ephemeral=True,
+        )
+        return
+
+    # Admission control first, so throttled callers never reach the entitlements API or DB
+    if not await admit_or_slow_down(interaction, cost=max(1, len(dj_names_list))):
+        return
+
     # Premium gate (per-user entitlements), unless server is whitelisted
     if not await ensure_premium_or_upsell(interaction):
         return
 
-    # Split DJ names
-    dj_names_list = [name.strip() for name in dj_names.split(",") if name.strip()]
     if not dj_names_list:
         await interaction.response.send_message(
             "Please provide at least one DJ name (comma-separated). Example: `DJ1, DJ2`",
@@ -355,10 +594,14 @@ async def get_dj_links(interaction: discord.Interaction, quest: bool, dj_names:
     links_response = [f"Quest Compatible = {quest}"]
 
     for dj_name in dj_names_list:
-        result = get_dj_links_from_db(dj_name, quest)
+        result = await find_dj_link(dj_name, quest)
         if result:
             found_dj_name, link = result
-            links_response.append(f"**{found_dj_name}** - {link if link else 'No link available'}")
+            line = f"**{found_dj_name}** - {link if link else 'No link available'}"
+            liveness = describe(bot.prober.status_for(link)) if bot.prober and link else ""
+            if liveness:
+                line += f" ({liveness})"
+            links_response.append(line)
         else:
             links_response.append(f"No match found for **{dj_name}**.")
 
@@ -373,6 +616,9 @@ async def get_dj_links(interaction: discord.Interaction, quest: bool, dj_names:
 async def add_link(interaction: discord.Interaction, dj_name: str, dj_link: str):
     submitter_id = interaction.user.id
 
+    if not await admit_or_slow_down(interaction, cost=ADD_LINK_COST):
+        return
+
     # Defer early (ephemeral) since we may do multiple DB operations + wait for a view
     await interaction.response.defer(ephemeral=True)
 
@@ -394,6 +640,10 @@ async def add_link(interaction: discord.Interaction, dj_name: str, dj_link: str)
         await view.wait()
 
         if view.value == "yes":
+            try:
+                record_confirmed_alias(dj_name, existing_dj_name)
+            except Exception:
+                logging.exception("Failed to record confirmed alias.")
             await interaction.followup.send(
                 "Submission canceled. That DJ already exists in the database.",
                 ephemeral=True,
@@ -0,0 +1,200 @@
+"""
+In-memory snapshot of the `links` table with pg_trgm-compatible fuzzy lookup.
+
+The snapshot is rebuilt off the event loop (see `Catalog.refresh`) and swapped in
+with a single attribute assignment, so readers never see a half-built index.
+Matching mirrors `get_dj_links_from_db`: an exact (normalized) name or `dj_aliases`
+hit first, with real names always beating aliases, then the best
+`SIMILARITY(dj_name, query)` above 0.4.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from aliases import load_aliases, normalize_alias
+
+SIMILARITY_THRESHOLD = 0.4
+
+
+# -----------------------------------------------------------------------------
+# Trigrams (same rules as pg_trgm's show_trgm / similarity)
+# -----------------------------------------------------------------------------
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """
+    Lowercases, splits on non-alphanumerics, pads each word with two leading
+    and one trailing space, and returns the set of 3-character windows.
+    """
+    grams: Set[str] = set()
+    word: List[str] = []
+    for ch in text.lower() + " ":
+        if ch.isalnum():
+            word.append(ch)
+            continue
+        if word:
+            padded = "  " + "".join(word) + " "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+            word = []
+    return frozenset(grams)
+
+
+def similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+# -----------------------------------------------------------------------------
+# Snapshot
+# -----------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    dj_name: str
+    quest_link: Optional[str]
+    non_quest_link: Optional[str]
+
+    def link(self, is_quest: bool) -> Optional[str]:
+        return self.quest_link if is_quest else self.non_quest_link
+
+
+@dataclass
+class _Snapshot:
+    entries: List[CatalogEntry]
+    grams: List[FrozenSet[str]]
+    index: Dict[str, List[int]]  # trigram -> entry positions
+    exact: Dict[str, int]        # normalized name or alias -> entry position
+    body: bytes
+    body_gzip: bytes
+    etag: str
+    loaded_at: float
+
+
+def _build_snapshot(rows: List[Tuple[str, Optional[str], Optional[str]]],
+                    alias_rows: List[Tuple[str, str]], loaded_at: float) -> _Snapshot:
+    entries = [CatalogEntry(*row) for row in sorted(rows, key=lambda r: r[0])]
+    grams = [trigrams(e.dj_name) for e in entries]
+
+    # Aliases first, then canonical names on top, so an alias can never shadow a real DJ
+    positions = {e.dj_name: pos for pos, e in enumerate(entries)}
+    exact = {alias: positions[name] for alias, name in alias_rows if name in positions}
+    names: Dict[str, int] = {}
+    for pos, e in enumerate(entries):
+        names.setdefault(normalize_alias(e.dj_name), pos)
+    exact.update(names)
+
+    index: Dict[str, List[int]] = {}
+    for pos, entry_grams in enumerate(grams):
+        for gram in entry_grams:
+            index.setdefault(gram, []).append(pos)
+
+    body = json.dumps(
+        {
+            "count": len(entries),
+            "links": [
+                {"dj_name": e.dj_name, "quest_link": e.quest_link, "non_quest_link": e.non_quest_link}
+                for e in entries
+            ],
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+    return _Snapshot(
+        entries=entries,
+        grams=grams,
+        index=index,
+        exact=exact,
+        body=body,
+        body_gzip=gzip.compress(body, compresslevel=6),
+        etag='"' + hashlib.sha1(body).hexdigest() + '"',
+        loaded_at=loaded_at,
+    )
+
+
+class Catalog:
+    """
+    Read-mostly, in-memory copy of `links(dj_name, quest_link, non_quest_link)`.
+    """
+    def __init__(self, connect: Callable[[], object]):
+        self._connect = connect
+        self._snapshot = _build_snapshot([], [], loaded_at=0.0)
+
+    def __len__(self) -> int:
+        return len(self._snapshot.entries)
+
+    @property
+    def etag(self) -> str:
+        return self._snapshot.etag
+
+    @property
+    def body(self) -> bytes:
+        return self._snapshot.body
+
+    @property
+    def body_gzip(self) -> bytes:
+        return self._snapshot.body_gzip
+
+    @property
+    def loaded_at(self) -> float:
+        return self._snapshot.loaded_at
+
+    def links(self) -> List[Optional[str]]:
+        """
+        Every stored quest/non-quest link in the current snapshot (may contain None).
+        """
+        return [link for e in self._snapshot.entries for link in (e.quest_link, e.non_quest_link)]
+
+    def refresh(self) -> bool:
+        """
+        Reloads the snapshot from the DB (blocking; run via asyncio.to_thread).
+        Returns True if the catalog content changed.
+        """
+        conn = self._connect()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT dj_name, quest_link, non_quest_link FROM links;")
+                rows = cur.fetchall()
+                alias_rows = load_aliases(cur)
+        finally:
+            conn.close()
+
+        snapshot = _build_snapshot(rows, alias_rows, loaded_at=time.time())
+        changed = snapshot.etag != self._snapshot.etag
+        self._snapshot = snapshot
+        if changed:
+            logging.info(f"Catalog refreshed: {len(snapshot.entries)} links, etag {snapshot.etag}")
+        return changed
+
+    def lookup(self, dj_name: str) -> Optional[Tuple[CatalogEntry, float]]:
+        """
+        Exact name or alias hit (score 1.0), else best fuzzy match for `dj_name` above
+        SIMILARITY_THRESHOLD, with its score. Only entries sharing at least one
+        trigram with the query are scored.
+        """
+        snap = self._snapshot
+        pos = snap.exact.get(normalize_alias(dj_name))
+        if pos is not None:
+            return snap.entries[pos], 1.0
+
+        query = trigrams(dj_name)
+        if not query:
+            return None
+
+        candidates: Set[int] = set()
+        for gram in query:
+            candidates.update(snap.index.get(gram, ()))
+
+        best: Optional[Tuple[CatalogEntry, float]] = None
+        for pos in sorted(candidates):
+            score = similarity(query, snap.grams[pos])
+            if score > SIMILARITY_THRESHOLD and (best is None or score > best[1]):
+                best = (snap.entries[pos], score)
+        return best
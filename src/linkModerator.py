@@ -4,6 +4,7 @@ import psycopg2
 from tkinter import messagebox
 import sys
 from dotenv import load_dotenv
+from aliases import SOURCE_MODERATOR, record_alias
 
 def resource_path(relative_path):
     """ Get absolute path to resource, works for PyInstaller and development """
@@ -60,16 +61,17 @@ def convert_links(quest_link):
 
 # Function to fetch the next request in FIFO order
 def fetch_next_request():
-    cursor.execute("SELECT id, dj_name, dj_link FROM requests ORDER BY id LIMIT 1")
+    cursor.execute("SELECT id, dj_name, dj_link FROM requests WHERE review_status = 'Pending' ORDER BY id LIMIT 1")
     return cursor.fetchone()
 
 # Function to fetch similar DJs from the database
 def fetch_similar_djs(dj_name):
     cursor.execute("""
     SELECT dj_name, quest_link, non_quest_link FROM links
-    WHERE SIMILARITY(dj_name, %s) > 0.4
+    WHERE dj_name %% %s AND SIMILARITY(dj_name, %s) > 0.4
+    ORDER BY dj_name <-> %s
     LIMIT 1
-    """, (dj_name,))
+    """, (dj_name, dj_name, dj_name))
     return cursor.fetchone()
 
 # Function to enable or disable buttons based on whether there are requests
@@ -88,13 +90,25 @@ def accept_request():
     non_quest_link = non_quest_link_entry.get()
     request_id = request_data[0]
 
-    cursor.execute("""
-    INSERT INTO links (dj_name, quest_link, non_quest_link)
-    VALUES (%s, %s, %s)
-    """, (dj_name, quest_link, non_quest_link))
-
-    cursor.execute("DELETE FROM requests WHERE id = %s", (request_id,))
-    conn.commit()
+    # An accepted request for a DJ already in `links` replaces that DJ's links
+    try:
+        cursor.execute("""
+        INSERT INTO links (dj_name, quest_link, non_quest_link)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (dj_name) DO UPDATE
+            SET quest_link = EXCLUDED.quest_link, non_quest_link = EXCLUDED.non_quest_link
+        """, (dj_name, quest_link, non_quest_link))
+
+        # If the name was corrected, remember what the submitter typed as an alias
+        record_alias(cursor, request_data[1], dj_name, SOURCE_MODERATOR)
+
+        cursor.execute("DELETE FROM requests WHERE id = %s", (request_id,))
+        conn.commit()
+    except psycopg2.Error as e:
+        # Don't leave the shared connection stuck in an aborted transaction
+        conn.rollback()
+        messagebox.showerror("Error", f"Could not accept the request:\n{e}")
+        return
 
     messagebox.showinfo("Success", "DJ accepted and added to the database.")
     load_next_request()
@@ -0,0 +1,323 @@
+"""
+Versioned schema migrations and hot-query plan checks.
+
+Migrations are applied in order and recorded in `schema_migrations`. A session-level
+advisory lock keeps two bot instances from migrating at once; it is only ever *tried*,
+never waited on, because a session blocked in pg_advisory_lock holds a snapshot that
+CREATE INDEX CONCURRENTLY in the lock holder would wait for (a deadlock). Index migrations are
+marked `concurrent` and run outside a transaction with CREATE INDEX CONCURRENTLY, so
+existing deployments keep accepting writes while indexes build. A failed concurrent
+build leaves an INVALID index behind; it is dropped before the next attempt.
+
+`check_plans` runs EXPLAIN on the queries the bot and moderator tool issue most and
+reports any that no longer use their expected index. It disables sequential scans for
+the check so that small tables (where a seq scan is cheaper) still prove the index is usable.
+
+Usage:
+    python src/migrations.py            # apply pending migrations, then check plans
+    python src/migrations.py --check    # only check plans
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sys
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, List, Tuple
+
+from aliases import NORMALIZE_SQL
+
+ADVISORY_LOCK_KEY = 0x646A6C6E6B  # "djlnk"
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: Tuple[str, ...]
+    concurrent: bool = False          # run outside a transaction (CREATE INDEX CONCURRENTLY)
+    index_name: str = ""              # for concurrent index builds: drop if left INVALID
+    hint: str = ""                    # appended to the error if this migration fails
+
+
+MIGRATIONS: Tuple[Migration, ...] = (
+    Migration(1, "base schema", (
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+        """
+        CREATE TABLE IF NOT EXISTS links (
+            dj_name         TEXT NOT NULL,
+            quest_link      TEXT,
+            non_quest_link  TEXT
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS requests (
+            id              SERIAL PRIMARY KEY,
+            dj_name         TEXT NOT NULL,
+            dj_link         TEXT NOT NULL,
+            submitter_id    TEXT NOT NULL,
+            review_status   TEXT NOT NULL DEFAULT 'Pending'
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS dj_aliases (
+            alias       TEXT PRIMARY KEY,
+            dj_name     TEXT NOT NULL,
+            source      TEXT NOT NULL,
+            created_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS link_status (
+            url             TEXT PRIMARY KEY,
+            status          TEXT NOT NULL,
+            http_status     INTEGER,
+            last_checked    TIMESTAMPTZ NOT NULL,
+            last_seen_live  TIMESTAMPTZ,
+            failures        INTEGER NOT NULL DEFAULT 0,
+            next_check      TIMESTAMPTZ NOT NULL
+        );
+        """,
+    )),
+    # GiST (not GIN) so `ORDER BY dj_name <-> q` can be answered by a KNN index scan
+    Migration(2, "trigram index on links.dj_name", (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS links_dj_name_trgm_idx ON links USING gist (dj_name gist_trgm_ops);",
+    ), concurrent=True, index_name="links_dj_name_trgm_idx"),
+    Migration(3, "requests review queue index", (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS requests_review_status_id_idx ON requests (review_status, id);",
+    ), concurrent=True, index_name="requests_review_status_id_idx"),
+    # Lets alias lookups check "is this alias now a real DJ's name?" without a seq scan.
+    # Must stay textually identical to aliases.NORMALIZE_SQL for the planner to use it.
+    Migration(4, "normalized links.dj_name index", (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS links_dj_name_norm_idx "
+        f"ON links (({NORMALIZE_SQL.format(col='dj_name')}));",
+    ), concurrent=True, index_name="links_dj_name_norm_idx"),
+    # Last, so duplicate dj_names in an existing deployment don't hold back the other indexes.
+    # Required by `ON CONFLICT (dj_name)` in convert_json_to_postgresql.py and by alias joins
+    Migration(5, "unique links.dj_name", (
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS links_dj_name_key ON links (dj_name);",
+    ), concurrent=True, index_name="links_dj_name_key",
+       hint="Remove duplicate `links.dj_name` rows, then restart to retry."),
+)
+
+
+# Hot queries and the index each must be able to use. Keep in sync with
+# get_dj_links_from_db / search_existing_dj_in_links (bot.py), lookup_alias (aliases.py)
+# and fetch_next_request (linkModerator.py).
+PLAN_CHECKS: Tuple[Tuple[str, str, Tuple[Any, ...], str], ...] = (
+    (
+        "get_dj_links fuzzy match",
+        """
+        SELECT dj_name, quest_link, SIMILARITY(dj_name, %s)
+        FROM links
+        WHERE dj_name %% %s AND SIMILARITY(dj_name, %s) > 0.4
+        ORDER BY dj_name <-> %s
+        LIMIT 1;
+        """,
+        ("plan check", "plan check", "plan check", "plan check"),
+        "links_dj_name_trgm_idx",
+    ),
+    (
+        "alias lookup",
+        f"""
+        SELECT l.dj_name, l.quest_link
+        FROM dj_aliases a
+        JOIN links l ON l.dj_name = a.dj_name
+        WHERE a.alias = %s
+          AND NOT EXISTS (SELECT 1 FROM links x WHERE {NORMALIZE_SQL.format(col="x.dj_name")} = a.alias)
+        LIMIT 1;
+        """,
+        ("plan check",),
+        "dj_aliases_pkey",
+    ),
+    (
+        "alias shadowed by a real DJ name",
+        f"SELECT 1 FROM links x WHERE {NORMALIZE_SQL.format(col='x.dj_name')} = %s;",
+        ("plan check",),
+        "links_dj_name_norm_idx",
+    ),
+    (
+        "next pending request",
+        "SELECT id, dj_name, dj_link FROM requests WHERE review_status = 'Pending' ORDER BY id LIMIT 1;",
+        (),
+        "requests_review_status_id_idx",
+    ),
+)
+
+
+# -----------------------------------------------------------------------------
+# Runner
+# -----------------------------------------------------------------------------
+
+def _applied_versions(cur) -> set:
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version     INTEGER PRIMARY KEY,
+        name        TEXT NOT NULL,
+        applied_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    """)
+    cur.execute("SELECT version FROM schema_migrations;")
+    return {row[0] for row in cur.fetchall()}
+
+
+def _drop_invalid_index(cur, index_name: str) -> None:
+    cur.execute("""
+    SELECT NOT i.indisvalid
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE c.relname = %s AND pg_catalog.pg_table_is_visible(c.oid);
+    """, (index_name,))
+    row = cur.fetchone()
+    if row and row[0]:
+        logging.warning(f"Dropping invalid index {index_name} left by an earlier failed build.")
+        cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name};")
+
+
+def _apply(conn, migration: Migration) -> None:
+    if migration.concurrent:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            if migration.index_name:
+                _drop_invalid_index(cur, migration.index_name)
+            try:
+                for statement in migration.statements:
+                    cur.execute(statement)
+            except Exception:
+                if migration.index_name:
+                    _drop_invalid_index(cur, migration.index_name)
+                raise
+            cur.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s);",
+                (migration.version, migration.name),
+            )
+        return
+
+    conn.autocommit = False
+    try:
+        with conn.cursor() as cur:
+            for statement in migration.statements:
+                cur.execute(statement)
+            cur.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s);",
+                (migration.version, migration.name),
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def migrate(connect: Callable[[], Any]) -> List[int]:
+    """
+    Applies pending migrations in order. Returns the versions applied, or an empty
+    list if another instance holds the migration lock (it will apply them instead).
+    Raises on the first failure; later migrations are left pending.
+    """
+    applied_now: List[int] = []
+    conn = connect()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_try_advisory_lock(%s);", (ADVISORY_LOCK_KEY,))
+            if not cur.fetchone()[0]:
+                logging.info("Another instance is applying migrations; skipping.")
+                return applied_now
+        try:
+            with conn.cursor() as cur:
+                applied = _applied_versions(cur)
+
+            for migration in MIGRATIONS:
+                if migration.version in applied:
+                    continue
+                logging.info(f"Applying migration {migration.version}: {migration.name}")
+                try:
+                    _apply(conn, migration)
+                except Exception as e:
+                    msg = f"Migration {migration.version} ({migration.name}) failed: {e}"
+                    if migration.hint:
+                        msg += f" {migration.hint}"
+                    raise RuntimeError(msg) from e
+                applied_now.append(migration.version)
+        finally:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_unlock(%s);", (ADVISORY_LOCK_KEY,))
+    finally:
+        conn.close()
+    return applied_now
+
+
+# -----------------------------------------------------------------------------
+# Plan checks
+# -----------------------------------------------------------------------------
+
+def _index_names(plan: dict) -> Iterator[str]:
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for child in plan.get("Plans", ()):
+        yield from _index_names(child)
+
+
+def check_plans(connect: Callable[[], Any]) -> List[str]:
+    """
+    EXPLAINs each PLAN_CHECKS query with sequential scans disabled and returns a
+    description of every query whose plan does not use its expected index.
+    """
+    problems: List[str] = []
+    conn = connect()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL enable_seqscan = off;")
+            for label, query, params, expected_index in PLAN_CHECKS:
+                cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+                plan_doc = cur.fetchone()[0]
+                if isinstance(plan_doc, str):
+                    plan_doc = json.loads(plan_doc)
+                used = set(_index_names(plan_doc[0]["Plan"]))
+                if expected_index not in used:
+                    problems.append(
+                        f"{label}: expected index {expected_index}, plan uses {sorted(used) or 'no index'}"
+                    )
+        conn.rollback()
+    finally:
+        conn.close()
+    return problems
+
+
+def main(argv: List[str]) -> int:
+    import argparse
+    import os
+
+    import psycopg2
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Apply schema migrations and check hot-query plans.")
+    parser.add_argument("--check", action="store_true", help="only run EXPLAIN plan checks")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    load_dotenv()
+    database_url = os.getenv("DATABASE_URL_DJ", "").strip()
+    if not database_url:
+        print("DATABASE_URL_DJ is not set.", file=sys.stderr)
+        return 1
+
+    def connect():
+        return psycopg2.connect(database_url)
+
+    if not args.check:
+        applied = migrate(connect)
+        logging.info(f"Applied migrations: {applied or 'none pending'}")
+
+    problems = check_plans(connect)
+    for problem in problems:
+        logging.warning(f"Plan check failed - {problem}")
+    if not problems:
+        logging.info("All hot queries use their expected indexes.")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
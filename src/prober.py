@@ -0,0 +1,293 @@
+"""
+Background liveness prober for catalog stream links.
+
+Each distinct stream is probed with a cheap HEAD (falling back to a 1-byte ranged GET
+when HEAD is refused) under a global concurrency cap plus a per-host cap and minimum
+spacing between request starts. Re-check intervals adapt to the result: live streams
+are re-checked every `live_interval`, offline/erroring ones back off exponentially up
+to `max_interval`. Results are kept in memory for lookups and persisted to
+`link_status` so the schedule survives restarts.
+
+Non-HTTP vrcdn links (rtspt://, rtmp://) are probed through their HTTPS `.live.ts`
+equivalent, so a DJ's Quest and non-Quest links share one status.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+LIVE = "live"
+OFFLINE = "offline"
+ERROR = "error"
+
+_VRCDN_PREFIXES = (
+    "rtspt://stream.vrcdn.live/live/",
+    "rtmp://stream.vrcdn.live/live/",
+)
+
+
+def probe_url_for(link: Optional[str]) -> Optional[str]:
+    """
+    Maps a stored link to the HTTP(S) URL we can probe, or None if it is not probeable.
+    """
+    if not link:
+        return None
+    link = link.strip()
+    for prefix in _VRCDN_PREFIXES:
+        if link.startswith(prefix):
+            username = link[len(prefix):]
+            return f"https://stream.vrcdn.live/live/{username}.live.ts"
+    if link.startswith(("http://", "https://")):
+        return link
+    return None
+
+
+@dataclass
+class LinkStatus:
+    url: str
+    status: str
+    http_status: Optional[int]
+    last_checked: float
+    last_seen_live: Optional[float]
+    failures: int              # consecutive non-live results
+    next_check: float
+
+
+def _classify(http_status: int) -> str:
+    if 200 <= http_status < 300:
+        return LIVE
+    if http_status in (404, 410):
+        return OFFLINE
+    return ERROR
+
+
+async def probe_once(session: aiohttp.ClientSession, url: str) -> Tuple[str, Optional[int]]:
+    """
+    Returns (status, http_status). Never raises for network errors; those map to ERROR.
+    """
+    try:
+        async with session.head(url, allow_redirects=True) as resp:
+            if resp.status not in (405, 501):
+                return _classify(resp.status), resp.status
+        # HEAD refused: ask for a single byte and drop the connection without reading
+        async with session.get(url, headers={"Range": "bytes=0-0"}, allow_redirects=True) as resp:
+            return _classify(resp.status), resp.status
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return ERROR, None
+
+
+class LinkProber:
+    def __init__(
+        self,
+        connect: Callable[[], object],
+        concurrency: int = 16,
+        per_host: int = 4,
+        min_host_interval: float = 0.25,
+        live_interval: float = 120.0,
+        offline_interval: float = 600.0,
+        max_interval: float = 86400.0,
+        request_timeout: float = 10.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._connect = connect
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.min_host_interval = min_host_interval
+        self.live_interval = live_interval
+        self.offline_interval = offline_interval
+        self.max_interval = max_interval
+        self.request_timeout = request_timeout
+        self._clock = clock
+
+        self.statuses: Dict[str, LinkStatus] = {}
+        self._global = asyncio.Semaphore(concurrency)
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._host_next_start: Dict[str, float] = {}
+
+    # -------------------------------------------------------------------------
+    # Lookups (used by commands / API; never probe inline)
+    # -------------------------------------------------------------------------
+
+    def status_for(self, link: Optional[str]) -> Optional[LinkStatus]:
+        url = probe_url_for(link)
+        return self.statuses.get(url) if url else None
+
+    # -------------------------------------------------------------------------
+    # Scheduling
+    # -------------------------------------------------------------------------
+
+    def _next_interval(self, status: str, failures: int) -> float:
+        if status == LIVE:
+            base = self.live_interval
+        else:
+            base = min(self.max_interval, self.offline_interval * (2 ** max(0, failures - 1)))
+        return base * random.uniform(0.9, 1.1)  # jitter so checks don't synchronise
+
+    def due(self, links: Iterable[Optional[str]], now: Optional[float] = None) -> List[str]:
+        """
+        Probe URLs for `links` that have never been checked or whose next_check has passed.
+        """
+        now = self._clock() if now is None else now
+        urls = {probe_url_for(link) for link in links}
+        urls.discard(None)
+        return [
+            url for url in urls
+            if url not in self.statuses or self.statuses[url].next_check <= now
+        ]
+
+    async def _probe_polite(self, session: aiohttp.ClientSession, url: str) -> LinkStatus:
+        host = urlsplit(url).netloc
+        slot = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host))
+
+        async with slot:
+            now = time.monotonic()
+            start_at = max(now, self._host_next_start.get(host, now))
+            self._host_next_start[host] = start_at + self.min_host_interval
+            if start_at > now:
+                await asyncio.sleep(start_at - now)
+
+            async with self._global:
+                status, http_status = await probe_once(session, url)
+
+        now = self._clock()
+        prev = self.statuses.get(url)
+        failures = 0 if status == LIVE else (prev.failures + 1 if prev else 1)
+        return LinkStatus(
+            url=url,
+            status=status,
+            http_status=http_status,
+            last_checked=now,
+            last_seen_live=now if status == LIVE else (prev.last_seen_live if prev else None),
+            failures=failures,
+            next_check=now + self._next_interval(status, failures),
+        )
+
+    async def probe(self, urls: List[str], session: Optional[aiohttp.ClientSession] = None) -> List[LinkStatus]:
+        """
+        Probes `urls` concurrently, updates in-memory statuses and returns the new rows.
+        """
+        if not urls:
+            return []
+
+        own_session = session is None
+        if own_session:
+            session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.request_timeout))
+        try:
+            results = await asyncio.gather(*(self._probe_polite(session, url) for url in urls))
+        finally:
+            if own_session:
+                await session.close()
+
+        for result in results:
+            self.statuses[result.url] = result
+        return list(results)
+
+    async def run(self, links: Callable[[], Iterable[Optional[str]]], tick: float = 15.0) -> None:
+        """
+        Forever: probe whatever is due among `links()`, persist, sleep `tick`.
+        """
+        try:
+            await asyncio.to_thread(self.load)
+        except Exception:
+            logging.exception("Failed to load link_status; starting with an empty schedule.")
+
+        while True:
+            try:
+                due = self.due(links())
+                if due:
+                    results = await self.probe(due)
+                    live = sum(1 for r in results if r.status == LIVE)
+                    logging.debug(f"Probed {len(results)} links ({live} live)")
+                    await asyncio.to_thread(self.save, results)
+            except Exception:
+                logging.exception("Link prober pass failed.")
+            await asyncio.sleep(tick)
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def load(self) -> None:
+        conn = self._connect()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                SELECT url, status, http_status,
+                       EXTRACT(EPOCH FROM last_checked),
+                       EXTRACT(EPOCH FROM last_seen_live),
+                       failures,
+                       EXTRACT(EPOCH FROM next_check)
+                FROM link_status;
+                """)
+                rows = cur.fetchall()
+        finally:
+            conn.close()
+
+        for url, status, http_status, last_checked, last_seen_live, failures, next_check in rows:
+            self.statuses[url] = LinkStatus(
+                url=url,
+                status=status,
+                http_status=http_status,
+                last_checked=float(last_checked),
+                last_seen_live=float(last_seen_live) if last_seen_live is not None else None,
+                failures=failures,
+                next_check=float(next_check),
+            )
+        logging.info(f"Loaded {len(rows)} link statuses.")
+
+    def save(self, results: List[LinkStatus]) -> None:
+        if not results:
+            return
+
+        def ts(epoch: Optional[float]) -> Optional[datetime]:
+            return datetime.fromtimestamp(epoch, timezone.utc) if epoch is not None else None
+
+        conn = self._connect()
+        try:
+            with conn.cursor() as cur:
+                cur.executemany("""
+                INSERT INTO link_status (url, status, http_status, last_checked, last_seen_live, failures, next_check)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (url) DO UPDATE SET
+                    status = EXCLUDED.status,
+                    http_status = EXCLUDED.http_status,
+                    last_checked = EXCLUDED.last_checked,
+                    last_seen_live = EXCLUDED.last_seen_live,
+                    failures = EXCLUDED.failures,
+                    next_check = EXCLUDED.next_check;
+                """, [
+                    (r.url, r.status, r.http_status, ts(r.last_checked), ts(r.last_seen_live), r.failures, ts(r.next_check))
+                    for r in results
+                ])
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def describe(status: Optional[LinkStatus], now: Optional[float] = None) -> str:
+    """
+    Short human-readable liveness note for Discord replies ("" when unknown).
+    """
+    if status is None:
+        return ""
+    if status.status == LIVE:
+        return "live"
+    label = "offline" if status.status == OFFLINE else "unreachable"
+    if status.last_seen_live is None:
+        return label
+    now = time.time() if now is None else now
+    ago = max(0, now - status.last_seen_live)
+    if ago < 3600:
+        return f"{label}, last live {int(ago // 60)}m ago"
+    if ago < 86400:
+        return f"{label}, last live {int(ago // 3600)}h ago"
+    return f"{label}, last live {int(ago // 86400)}d ago"
@@ -0,0 +1,129 @@
+"""
+Token-bucket admission control.
+
+Buckets are keyed (user ID, guild ID, API key, ...) and refill continuously at
+`refill_per_sec` up to `capacity`. A request costing more than `capacity` is admitted
+once the bucket is full and then leaves it in debt, so every unit of cost is paid for.
+State per key is a single (tokens, stamp)
+tuple held in an LRU-bounded OrderedDict, so memory stays flat no matter how
+many distinct keys show up. An evicted key simply comes back with a full bucket.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class BucketConfig:
+    capacity: float          # burst size, in cost units
+    refill_per_sec: float    # sustained rate, in cost units per second
+
+    @classmethod
+    def parse(cls, raw: str, default: "BucketConfig", name: str = "rate limit") -> "BucketConfig":
+        """
+        Parses "capacity/per_minute" (e.g. "10/30"). Empty input means `default`;
+        malformed, non-positive or non-finite input logs a warning and also uses `default`.
+        """
+        if not raw:
+            return default
+        try:
+            capacity, per_minute = (float(part) for part in raw.split("/", 1))
+        except ValueError:
+            capacity = per_minute = math.nan
+        if not (math.isfinite(capacity) and math.isfinite(per_minute)) or capacity <= 0 or per_minute <= 0:
+            logging.warning(f"{name} must be \"burst/per_minute\" with positive numbers, got {raw!r}; using default.")
+            return default
+        return cls(capacity=capacity, refill_per_sec=per_minute / 60.0)
+
+
+class TokenBuckets:
+    """
+    A family of token buckets sharing one config, keyed by an arbitrary hashable.
+    """
+    def __init__(self, config: BucketConfig, max_keys: int = 10_000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.config = config
+        self.max_keys = max_keys
+        self._clock = clock
+        self._state: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def _tokens(self, key: Hashable, now: float) -> float:
+        entry = self._state.get(key)
+        if entry is None:
+            return self.config.capacity
+        tokens, stamp = entry
+        return min(self.config.capacity, tokens + (now - stamp) * self.config.refill_per_sec)
+
+    def retry_after(self, key: Hashable, cost: float, now: Optional[float] = None) -> float:
+        """
+        Seconds until `key` may spend `cost` (0.0 if it may now). Costs above capacity
+        only need a full bucket to start; `consume` still charges them in full.
+        """
+        now = self._clock() if now is None else now
+        cost = min(cost, self.config.capacity)
+        missing = cost - self._tokens(key, now)
+        if missing <= 0:
+            return 0.0
+        return missing / self.config.refill_per_sec
+
+    def consume(self, key: Hashable, cost: float, now: Optional[float] = None) -> None:
+        now = self._clock() if now is None else now
+        tokens = self._tokens(key, now) - cost  # may go negative for oversized costs
+        self._state[key] = (tokens, now)
+        self._state.move_to_end(key)
+        while len(self._state) > self.max_keys:
+            self._state.popitem(last=False)
+
+    def try_acquire(self, key: Hashable, cost: float = 1.0) -> float:
+        """
+        Consumes `cost` tokens if available. Returns 0.0 on success, else seconds to wait.
+        """
+        now = self._clock()
+        wait = self.retry_after(key, cost, now)
+        if wait == 0.0:
+            self.consume(key, cost, now)
+        return wait
+
+
+class AdmissionController:
+    """
+    Admits a request only if the user, guild and global buckets can all pay its cost.
+    Nothing is charged on rejection, so a throttled user does not dig themselves deeper.
+    """
+    GLOBAL_KEY = "*"
+
+    def __init__(self, user: BucketConfig, guild: BucketConfig, global_: BucketConfig,
+                 max_keys: int = 10_000, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.users = TokenBuckets(user, max_keys=max_keys, clock=clock)
+        self.guilds = TokenBuckets(guild, max_keys=max_keys, clock=clock)
+        self.global_ = TokenBuckets(global_, max_keys=1, clock=clock)
+
+    def admit(self, user_id: int, guild_id: Optional[int], cost: float = 1.0) -> float:
+        """
+        Returns 0.0 if admitted (and charges every bucket), else the longest wait in seconds.
+        """
+        now = self._clock()
+        checks: List[Tuple[TokenBuckets, Hashable]] = [
+            (self.users, user_id),
+            (self.global_, self.GLOBAL_KEY),
+        ]
+        if guild_id is not None:
+            checks.insert(1, (self.guilds, guild_id))
+
+        wait = max(buckets.retry_after(key, cost, now) for buckets, key in checks)
+        if wait > 0.0:
+            return wait
+
+        for buckets, key in checks:
+            buckets.consume(key, cost, now)
+        return 0.0
@@ -0,0 +1,23 @@
+from aliases import NORMALIZE_SQL, AliasLearner, normalize_alias
+
+
+def test_normalize_alias_is_ascii_only():
+    assert normalize_alias("  DJ \t  Snake\n") == "dj snake"
+    # Left alone because SQL translate()/btrim() in NORMALIZE_SQL would not touch them either
+    assert normalize_alias("ÄSS ß") == "Äss ß"
+    assert normalize_alias("a\xa0b") == "a\xa0b"
+
+
+def test_normalize_sql_covers_the_same_whitespace():
+    # \v is spelled \x0b because PostgreSQL E'' strings have no \v escape
+    assert NORMALIZE_SQL.count(r"\t\n\r\f\x0b") == 2
+    assert "'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'" in NORMALIZE_SQL
+
+
+def test_learner_persists_after_repeated_confident_hits():
+    learner = AliasLearner(min_similarity=0.7, after_hits=3)
+    assert not learner.observe("dj snak", "DJ Snake", 0.5)        # too unsure to count
+    assert not learner.observe("dj snak", "DJ Snake", 0.8)
+    assert not learner.observe("DJ  Snak", "DJ Snake", 0.8)       # same normalized query
+    assert learner.observe("dj snak", "DJ Snake", 0.8)
+    assert not learner.observe("dj snake", "DJ Snake", 0.9)       # the name itself is not an alias
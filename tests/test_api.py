@@ -0,0 +1,122 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+
+from api import create_app  # noqa: E402
+from catalog import Catalog, _build_snapshot  # noqa: E402
+from ratelimit import BucketConfig, TokenBuckets  # noqa: E402
+
+
+def _catalog():
+    catalog = Catalog(connect=None)
+    catalog._snapshot = _build_snapshot(
+        [("DJ Snake", "q-snake", "n-snake"), ("Two Words", "q-two", "n-two")],
+        [("snakey", "DJ Snake")],
+        loaded_at=0.0,
+    )
+    return catalog
+
+
+def _run(app, scenario):
+    async def run():
+        async with TestClient(TestServer(app)) as client:
+            await scenario(client)
+    asyncio.run(run())
+
+
+def _limiter(capacity=100, refill_per_sec=0.001):
+    return TokenBuckets(BucketConfig(capacity=capacity, refill_per_sec=refill_per_sec))
+
+
+def test_lookup_resolves_names_and_aliases():
+    async def scenario(client):
+        resp = await client.post("/v1/lookup", json={"dj_names": ["snakey", " two word ", "", "zzz"], "quest": True})
+        assert resp.status == 200
+        body = await resp.json()
+        assert body["quest"] is True
+        assert [(r["query"], r["dj_name"], r["link"]) for r in body["results"]] == [
+            ("snakey", "DJ Snake", "q-snake"),
+            ("two word", "Two Words", "q-two"),
+            ("zzz", None, None),
+        ]
+        assert body["results"][0]["similarity"] == 1.0
+
+    _run(create_app(_catalog(), _limiter()), scenario)
+
+
+def test_lookup_rejects_bad_input():
+    async def scenario(client):
+        bad_bodies = [
+            {"dj_names": ["DJ Snake"], "quest": "false"},
+            {"dj_names": ["DJ Snake"], "quest": 1},
+            {"dj_names": "DJ Snake"},
+            {"dj_names": ["DJ Snake", 3]},
+            {"quest": True},
+            ["DJ Snake"],
+            {"dj_names": [f"dj {i}" for i in range(51)]},
+        ]
+        for payload in bad_bodies:
+            resp = await client.post("/v1/lookup", json=payload)
+            assert resp.status == 400, payload
+
+        resp = await client.post("/v1/lookup", data=b"not json", headers={"Content-Type": "application/json"})
+        assert resp.status == 400
+
+    _run(create_app(_catalog(), _limiter()), scenario)
+
+
+def test_catalog_etag_and_gzip():
+    catalog = _catalog()
+
+    async def scenario(client):
+        resp = await client.get("/v1/catalog", headers={"Accept-Encoding": "identity"})
+        assert resp.status == 200
+        assert resp.headers["ETag"] == catalog.etag
+        assert json.loads(await resp.read())["count"] == 2
+
+        resp = await client.get("/v1/catalog", headers={"If-None-Match": f'W/{catalog.etag}'})
+        assert resp.status == 304
+
+        resp = await client.get("/v1/catalog", headers={"If-None-Match": '"stale"', "Accept-Encoding": "gzip"},
+                                auto_decompress=False)
+        assert resp.status == 200
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(await resp.read()) == catalog.body
+
+    _run(create_app(catalog, _limiter()), scenario)
+
+
+def test_rate_limit_returns_retry_after():
+    async def scenario(client):
+        assert (await client.get("/v1/catalog")).status == 200
+        assert (await client.get("/v1/catalog")).status == 200
+        resp = await client.get("/v1/catalog")
+        assert resp.status == 429
+        assert int(resp.headers["Retry-After"]) >= 1
+
+        # A batch is charged per name, so it cannot slip through either
+        resp = await client.post("/v1/lookup", json={"dj_names": ["DJ Snake"]})
+        assert resp.status == 429
+
+    _run(create_app(_catalog(), _limiter(capacity=2)), scenario)
+
+
+def test_only_configured_api_keys_get_their_own_bucket():
+    app = create_app(_catalog(), _limiter(capacity=1), api_keys=frozenset({"overlay-key"}))
+
+    async def scenario(client):
+        assert (await client.get("/v1/catalog")).status == 200
+
+        # A made-up key falls back to the (already empty) per-address bucket
+        resp = await client.get("/v1/catalog", headers={"X-API-Key": "made-up"})
+        assert resp.status == 429
+
+        resp = await client.get("/v1/catalog", headers={"X-API-Key": "overlay-key"})
+        assert resp.status == 200
+
+    _run(app, scenario)
@@ -0,0 +1,53 @@
+import pytest
+
+from catalog import Catalog, _build_snapshot, similarity, trigrams
+
+
+def _catalog(rows, alias_rows=()):
+    catalog = Catalog(connect=None)
+    catalog._snapshot = _build_snapshot(list(rows), list(alias_rows), loaded_at=0.0)
+    return catalog
+
+
+def test_trigrams_match_pg_trgm():
+    # SELECT show_trgm('Cat') -> {"  c"," ca","at ",cat}
+    assert trigrams("Cat") == {"  c", " ca", "at ", "cat"}
+    # Non-alphanumerics split words, and each word is padded separately
+    assert trigrams("a-b") == {"  a", " a ", "  b", " b "}
+    assert trigrams("--") == frozenset()
+
+
+def test_similarity_matches_pg_trgm_and_cutoff():
+    # SELECT similarity('word', 'two words') -> 0.363636
+    score = similarity(trigrams("word"), trigrams("two words"))
+    assert score == pytest.approx(0.363636, abs=1e-6)
+
+    catalog = _catalog([("two words", "q", "n")])
+    assert catalog.lookup("word") is None             # below the 0.4 cutoff
+    entry, score = catalog.lookup("two word")
+    assert entry.dj_name == "two words" and 0.4 < score < 1.0
+
+
+def test_exact_name_beats_alias():
+    catalog = _catalog(
+        [("DJ Snake", "q-snake", "n-snake"), ("DJ Snak", "q-snak", "n-snak")],
+        [("dj snak", "DJ Snake"), ("snakey", "DJ Snake")],
+    )
+    entry, score = catalog.lookup("  dj  SNAK ")
+    assert (entry.dj_name, score) == ("DJ Snak", 1.0)
+
+    entry, score = catalog.lookup("Snakey")
+    assert (entry.dj_name, entry.link(is_quest=True), score) == ("DJ Snake", "q-snake", 1.0)
+
+
+def test_alias_for_unknown_dj_is_ignored():
+    catalog = _catalog([("DJ Snake", "q", "n")], [("ghost", "Nobody")])
+    assert catalog.lookup("ghost") is None
+
+
+def test_etag_changes_with_content():
+    a = _catalog([("DJ Snake", "q", "n")])
+    b = _catalog([("DJ Snake", "q", "n")])
+    c = _catalog([("DJ Snake", "q2", "n")])
+    assert a.etag == b.etag != c.etag
+    assert a.links() == ["q", "n"]
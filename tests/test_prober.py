@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+from prober import ERROR, LIVE, OFFLINE, LinkProber, describe  # noqa: E402
+
+
+def _fake_stream_app(seen):
+    async def live(request):
+        seen.append(("live", request.method))
+        return web.Response(status=200)
+
+    async def head_refused(request):
+        seen.append(("head_refused", request.method, request.headers.get("Range")))
+        if request.method == "HEAD":
+            return web.Response(status=405)
+        return web.Response(status=206, body=b"G")
+
+    app = web.Application()
+    app.router.add_route("*", "/live/live.live.ts", live)
+    app.router.add_route("*", "/live/headless.live.ts", head_refused)
+    return app
+
+
+def test_probe_classifies_fake_stream_server():
+    async def run():
+        seen = []
+        async with TestServer(_fake_stream_app(seen)) as server:
+            base = str(server.make_url("/live/"))
+            live, headless, missing = (
+                f"{base}live.live.ts", f"{base}headless.live.ts", f"{base}missing.live.ts"
+            )
+            prober = LinkProber(connect=None, per_host=2, min_host_interval=0.0)
+
+            due = prober.due([live, headless, missing, None, "rtspt://not-http"])
+            assert sorted(due) == sorted([live, headless, missing])
+
+            results = {r.url: r for r in await prober.probe(due)}
+        return seen, live, headless, missing, prober, results
+
+    seen, live, headless, missing, prober, results = asyncio.run(run())
+
+    assert (results[live].status, results[live].http_status) == (LIVE, 200)
+    assert (results[headless].status, results[headless].http_status) == (LIVE, 206)
+    assert (results[missing].status, results[missing].http_status) == (OFFLINE, 404)
+    assert ("head_refused", "GET", "bytes=0-0") in seen
+
+    # Live links are re-checked sooner than offline ones, and nothing is due right away
+    assert results[live].next_check - results[live].last_checked < \
+        results[missing].next_check - results[missing].last_checked
+    assert results[missing].failures == 1 and results[missing].last_seen_live is None
+    assert prober.due([live, headless, missing]) == []
+    assert describe(prober.status_for(live)) == "live"
+
+
+def test_probe_unreachable_host_is_error():
+    async def run():
+        prober = LinkProber(connect=None, request_timeout=2.0)
+        return await prober.probe(["http://127.0.0.1:9/live/x.live.ts"])
+
+    (result,) = asyncio.run(run())
+    assert (result.status, result.http_status) == (ERROR, None)
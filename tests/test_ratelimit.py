@@ -0,0 +1,113 @@
+import math
+
+from ratelimit import AdmissionController, BucketConfig, TokenBuckets
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_refills_over_time():
+    clock = FakeClock()
+    buckets = TokenBuckets(BucketConfig(capacity=2, refill_per_sec=1), clock=clock)
+
+    assert buckets.try_acquire("a") == 0.0
+    assert buckets.try_acquire("a") == 0.0
+    assert buckets.try_acquire("a") == 1.0
+
+    clock.now += 0.5
+    assert buckets.try_acquire("a") == 0.5
+    clock.now += 0.5
+    assert buckets.try_acquire("a") == 0.0
+
+    # Refill never exceeds capacity
+    clock.now += 100
+    assert buckets.try_acquire("a", 2) == 0.0
+    assert buckets.try_acquire("a", 1) > 0.0
+
+
+def test_rejection_charges_nothing():
+    clock = FakeClock()
+    buckets = TokenBuckets(BucketConfig(capacity=1, refill_per_sec=1), clock=clock)
+    buckets.try_acquire("a")
+
+    for _ in range(5):
+        assert buckets.try_acquire("a") > 0.0
+    clock.now += 1
+    assert buckets.try_acquire("a") == 0.0
+
+
+def test_oversized_cost_is_charged_in_full():
+    clock = FakeClock()
+    buckets = TokenBuckets(BucketConfig(capacity=10, refill_per_sec=1), clock=clock)
+
+    assert buckets.try_acquire("a", 3000) == 0.0
+    # 2990 tokens of debt to pay off before even a single lookup
+    assert buckets.try_acquire("a", 1) == 2991.0
+    assert buckets.try_acquire("b", 10) == 0.0
+    assert buckets.try_acquire("b", 1) == 1.0
+
+
+def test_lru_bound_evicts_least_recent_key():
+    clock = FakeClock()
+    buckets = TokenBuckets(BucketConfig(capacity=1, refill_per_sec=0.001), max_keys=2, clock=clock)
+    buckets.try_acquire("a")
+    buckets.try_acquire("b")
+    buckets.try_acquire("c")
+
+    assert len(buckets) == 2
+    assert buckets.try_acquire("a") == 0.0      # evicted, so back with a full bucket
+    assert buckets.try_acquire("c") > 0.0
+
+
+def test_admission_checks_user_guild_and_global():
+    clock = FakeClock()
+    admission = AdmissionController(
+        user=BucketConfig(capacity=3, refill_per_sec=1),
+        guild=BucketConfig(capacity=5, refill_per_sec=1),
+        global_=BucketConfig(capacity=7, refill_per_sec=1),
+        clock=clock,
+    )
+
+    assert admission.admit(user_id=1, guild_id=10, cost=3) == 0.0
+    assert admission.admit(user_id=1, guild_id=10, cost=1) == 1.0     # user bucket empty
+    assert admission.admit(user_id=2, guild_id=10, cost=3) == 1.0     # guild has 2 left
+    assert admission.admit(user_id=2, guild_id=10, cost=2) == 0.0     # rejected call wasn't charged
+
+    # DMs have no guild bucket, but still share the global one (7 - 5 = 2 left)
+    assert admission.admit(user_id=3, guild_id=None, cost=2) == 0.0
+    assert admission.admit(user_id=4, guild_id=None, cost=1) == 1.0
+    assert len(admission.guilds) == 1                                  # only guild 10 was charged
+
+
+def test_admission_charges_large_name_lists_proportionally():
+    clock = FakeClock()
+    admission = AdmissionController(
+        user=BucketConfig(capacity=10, refill_per_sec=1),
+        guild=BucketConfig(capacity=10_000, refill_per_sec=100),
+        global_=BucketConfig(capacity=10_000, refill_per_sec=100),
+        clock=clock,
+    )
+
+    assert admission.admit(user_id=1, guild_id=1, cost=3000) == 0.0
+    assert admission.admit(user_id=1, guild_id=1, cost=1) == 2991.0
+
+
+def test_parse_valid_and_empty():
+    default = BucketConfig(capacity=1, refill_per_sec=1)
+    assert BucketConfig.parse("5/30", default) == BucketConfig(capacity=5, refill_per_sec=0.5)
+    assert BucketConfig.parse("", default) is default
+
+
+def test_parse_rejects_malformed_and_non_finite(caplog):
+    default = BucketConfig(capacity=1, refill_per_sec=1)
+    for raw in ("abc", "3", "1/-1", "0/5", "nan/1", "1/nan", "inf/2", "2/inf"):
+        caplog.clear()
+        parsed = BucketConfig.parse(raw, default, "RATE_LIMIT_USER")
+        assert parsed is default, raw
+        assert math.isfinite(parsed.capacity)
+        assert "RATE_LIMIT_USER" in caplog.text, raw